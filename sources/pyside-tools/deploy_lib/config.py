@@ -1,11 +1,13 @@
 # Copyright (C) 2022 The Qt Company Ltd.
 # SPDX-License-Identifier: LicenseRef-Qt-Commercial OR LGPL-3.0-only OR GPL-2.0-only OR GPL-3.0-only
 
-import configparser
+import io
 import logging
+import os
 import warnings
 from configparser import ConfigParser
 from pathlib import Path
+from typing import Dict, Set, Tuple
 
 from project import ProjectData
 
@@ -14,7 +16,36 @@ from . import DEFAULT_APP_ICON
 
 # Some QML plugins like QtCore are excluded from this list as they don't contribute much to
 # executable size. Excluding them saves the extra processing of checking for them in files
-EXCLUDED_QML_PLUGINS = {"QtQuick", "QtQuick3D", "QtCharts", "QtWebEngine", "QtTest", "QtSensors"}
+EXCLUDED_QML_PLUGINS = frozenset({"QtQuick", "QtQuick3D", "QtCharts", "QtWebEngine", "QtTest",
+                                  "QtSensors"})
+# sorted, so that the excluded plugins written to the config file have a stable order
+EXCLUDED_QML_PLUGINS_SORTED = tuple(sorted(EXCLUDED_QML_PLUGINS))
+
+# Directories that are never searched for QML files of the application. site-packages contains
+# the QML files shipped with PySide6 when a venv is created inside the project directory
+EXCLUDED_QML_SEARCH_DIRS = frozenset({"site-packages", ".git", "__pycache__", "deployment",
+                                      "build"})
+
+
+def _find_qml_files(directory: Path):
+    """Recursively yield the QML files in 'directory', skipping EXCLUDED_QML_SEARCH_DIRS"""
+    sub_dirs = []
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        # skip unreadable directories, like Path.glob() does
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in EXCLUDED_QML_SEARCH_DIRS:
+                    sub_dirs.append(entry.path)
+            # normcase() makes the suffix check case-insensitive on Windows, like glob
+            elif os.path.normcase(entry.name).endswith(".qml"):
+                yield Path(entry.path)
+
+    for sub_dir in sub_dirs:
+        yield from _find_qml_files(sub_dir)
 
 
 class BaseConfig:
@@ -24,34 +55,61 @@ class BaseConfig:
         self.config_file = config_file
         self.existing_config_file = existing_config_file
         self.parser = ConfigParser(comment_prefixes=comment_prefixes, allow_no_value=True)
-        self.parser.read(self.config_file)
+        self.parser.read(self.config_file, encoding="utf-8")
+        # raw snapshot of the parsed config file. get_value() is served from here, which avoids
+        # going through ConfigParser's section proxies and interpolation on every lookup. Only
+        # values containing '%' are interpolated, on access, like ConfigParser.get() does
+        self._data: Dict[str, Dict[str, str]] = {
+            section: dict(self.parser.items(section, raw=True))
+            for section in self.parser.sections()
+        }
+        # (section, key) of the values changed since config_file was last written
+        self._pending: Set[Tuple[str, str]] = set()
 
     def update_config(self):
+        if not self._pending:
+            logging.info(f"[DEPLOY] {self.config_file} is up to date")
+            return
         logging.info(f"[DEPLOY] Creating {self.config_file}")
-        with open(self.config_file, "w+") as config_file:
-            self.parser.write(config_file, space_around_delimiters=True)
+        self._pending.clear()
+        # serialize in memory first, so that the file is written in one go instead of
+        # once per option
+        buffer = io.StringIO()
+        self.parser.write(buffer, space_around_delimiters=True)
+        Path(self.config_file).write_text(buffer.getvalue(), encoding="utf-8")
 
     def set_value(self, section: str, key: str, new_value: str, raise_warning: bool = True):
-        try:
-            current_value = self.get_value(section, key, ignore_fail=True)
-            if current_value != new_value:
-                self.parser.set(section, key, new_value)
-        except configparser.NoOptionError:
-            if raise_warning:
-                logging.warning(f"[DEPLOY] Key {key} does not exist")
-        except configparser.NoSectionError:
+        section_data = self._data.get(section)
+        if section_data is None:
             if raise_warning:
                 logging.warning(f"[DEPLOY] Section {section} does not exist")
+            return
+
+        key = self.parser.optionxform(key)
+        if self.get_value(section, key, ignore_fail=True) != new_value:
+            # ConfigParser.set() validates the type and the interpolation syntax of the value
+            self.parser.set(section, key, new_value)
+            section_data[key] = self.parser.get(section, key)
+            self._pending.add((section, key))
 
     def get_value(self, section: str, key: str, ignore_fail: bool = False):
-        try:
-            return self.parser.get(section, key)
-        except configparser.NoOptionError:
-            if not ignore_fail:
-                logging.warning(f"[DEPLOY] Key {key} does not exist")
-        except configparser.NoSectionError:
+        section_data = self._data.get(section)
+        if section_data is None:
             if not ignore_fail:
                 logging.warning(f"[DEPLOY] Section {section} does not exist")
+            return None
+
+        key = self.parser.optionxform(key)
+        if key not in section_data:
+            if not ignore_fail:
+                logging.warning(f"[DEPLOY] Key {key} does not exist")
+            return None
+
+        value = section_data[key]
+        if value and "%" in value:
+            # BasicInterpolation leaves values without '%' unchanged
+            value = self.parser.get(section, key)
+        return value
 
 
 class Config(BaseConfig):
@@ -65,11 +123,12 @@ class Config(BaseConfig):
         super().__init__(config_file=config_file, existing_config_file=existing_config_file)
 
         self._dry_run = dry_run
-        self.qml_modules = set()
+        self._cwd = Path.cwd()
+        self.qml_modules = frozenset()
         # set source_file
         self.source_file = Path(
             self.set_or_fetch(config_property_val=source_file, config_property_key="input_file")
-        ).resolve()
+        )
 
         # set python path
         self.python_path = Path(
@@ -90,21 +149,26 @@ class Config(BaseConfig):
             self.icon = DEFAULT_APP_ICON
 
         self.project_dir = None
-        if self.get_value("app", "project_dir"):
-            self.project_dir = Path(self.get_value("app", "project_dir")).absolute()
+        config_project_dir = self.get_value("app", "project_dir")
+        if config_project_dir:
+            self.project_dir = Path(config_project_dir).absolute()
         else:
             self._find_and_set_project_dir()
 
         self.exe_dir = None
-        if self.get_value("app", "exec_directory"):
-            self.exe_dir = Path(self.get_value("app", "exec_directory")).absolute()
+        config_exe_dir = self.get_value("app", "exec_directory")
+        if config_exe_dir:
+            self.exe_dir = Path(config_exe_dir).absolute()
         else:
             self._find_and_set_exe_dir()
 
+        # parsed .pyproject files, keyed by their absolute path
+        self._project_data_cache: Dict[Path, ProjectData] = {}
         self.project_data: ProjectData = None
-        if self.get_value("app", "project_file"):
-            project_file = Path(self.get_value("app", "project_file")).absolute()
-            self.project_data = ProjectData(project_file=project_file)
+        config_project_file = self.get_value("app", "project_file")
+        if config_project_file:
+            project_file = Path(config_project_file).absolute()
+            self.project_data = self._get_project_data(project_file)
         else:
             self._find_and_set_project_file()
 
@@ -116,8 +180,9 @@ class Config(BaseConfig):
             self._find_and_set_qml_files()
 
         self.excluded_qml_plugins = []
-        if self.get_value("qt", "excluded_qml_plugins") and self.existing_config_file:
-            self.excluded_qml_plugins = self.get_value("qt", "excluded_qml_plugins").split(",")
+        config_excluded_qml_plugins = self.get_value("qt", "excluded_qml_plugins")
+        if config_excluded_qml_plugins and self.existing_config_file:
+            self.excluded_qml_plugins = config_excluded_qml_plugins.split(",")
         else:
             self._find_and_set_excluded_qml_plugins()
 
@@ -133,8 +198,10 @@ class Config(BaseConfig):
         if config_property_val:
             self.set_value(config_property_group, config_property_key, str(config_property_val))
             return config_property_val
-        elif self.get_value(config_property_group, config_property_key):
-            return self.get_value(config_property_group, config_property_key)
+
+        config_value = self.get_value(config_property_group, config_property_key)
+        if config_value:
+            return config_value
         else:
             raise RuntimeError(
                 f"[DEPLOY] No {config_property_key} specified in config file or as cli option"
@@ -184,11 +251,15 @@ class Config(BaseConfig):
 
     @property
     def source_file(self):
+        # resolved on first access only, since not every code path needs the real path
+        if self._source_file is None:
+            self._source_file = self._source_file_raw.resolve()
         return self._source_file
 
     @source_file.setter
     def source_file(self, source_file: Path):
-        self._source_file = source_file
+        self._source_file_raw = source_file
+        self._source_file = None
 
     @property
     def python_path(self):
@@ -222,60 +293,55 @@ class Config(BaseConfig):
     def exe_dir(self, exe_dir: Path):
         self._exe_dir = exe_dir
 
+    def _get_project_data(self, project_file: Path) -> ProjectData:
+        """Parse 'project_file', reusing the result if it was already parsed"""
+        project_file = project_file.absolute()
+        if project_file not in self._project_data_cache:
+            self._project_data_cache[project_file] = ProjectData(project_file=project_file)
+        return self._project_data_cache[project_file]
+
     def _find_and_set_qml_files(self):
         """Fetches all the qml_files in the folder and sets them if the
         field qml_files is empty in the config_dir"""
 
         if self.project_data:
-            qml_files = self.project_data.qml_files
-            for sub_project_file in self.project_data.sub_projects_files:
-                qml_files.extend(ProjectData(project_file=sub_project_file).qml_files)
+            # copy, the list is owned by the (cached) ProjectData
+            qml_files = list(self.project_data.qml_files)
+            if self.project_data.sub_projects_files:
+                for sub_project_file in self.project_data.sub_projects_files:
+                    qml_files.extend(self._get_project_data(sub_project_file).qml_files)
+                # sub projects can share QML files. Drop the duplicates while keeping the
+                # order, to avoid passing the same file to Nuitka more than once
+                qml_files = list(dict.fromkeys(qml_files))
             self.qml_files = qml_files
         else:
             qml_files_temp = None
-            source_file = (
-                Path(self.get_value("app", "input_file"))
-                if self.get_value("app", "input_file")
-                else None
-            )
-            python_exe = (
-                Path(self.get_value("python", "python_path"))
-                if self.get_value("python", "python_path")
-                else None
-            )
+            config_input_file = self.get_value("app", "input_file")
+            source_file = Path(config_input_file) if config_input_file else None
+            config_python_path = self.get_value("python", "python_path")
+            python_exe = Path(config_python_path) if config_python_path else None
             if source_file and python_exe:
                 if not self.qml_files:
-                    qml_files_temp = list(source_file.parent.glob("**/*.qml"))
-
-                # add all QML files, excluding the ones shipped with installed PySide6
-                # The QML files shipped with PySide6 gets added if venv is used,
-                # because of recursive glob
-                if python_exe.parent.parent == source_file.parent:
-                    # python venv path is inside the main source dir
-                    qml_files_temp = list(
-                        set(qml_files_temp) - set(python_exe.parent.parent.rglob("*.qml"))
-                    )
+                    # add all QML files, excluding the ones shipped with installed PySide6
+                    qml_files_temp = list(_find_qml_files(source_file.parent))
 
                 if len(qml_files_temp) > 500:
-                    if "site-packages" in str(qml_files_temp[-1]):
-                        raise RuntimeError(
-                            "You are including a lot of QML files from a local virtual env."
-                            " This can lead to errors in deployment."
-                        )
-                    else:
-                        warnings.warn(
-                            "You seem to include a lot of QML files. This can lead to errors in "
-                            "deployment."
-                        )
+                    warnings.warn(
+                        "You seem to include a lot of QML files. This can lead to errors in "
+                        "deployment."
+                    )
 
                 if qml_files_temp:
                     extra_qml_files = [Path(file) for file in qml_files_temp]
                     self.qml_files.extend(extra_qml_files)
         if self.qml_files:
+            # this can run for hundreds of files. Work on plain strings instead of creating
+            # intermediate Path objects for every file
+            project_dir = os.fspath(self.project_dir.absolute())
             self.set_value(
                 "qt",
                 "qml_files",
-                ",".join([str(file.absolute().relative_to(self.project_dir))
+                ",".join([os.path.relpath(os.path.join(self._cwd, file), project_dir)
                           for file in self.qml_files]),
             )
             logging.info("[DEPLOY] QML files identified and set in config_file")
@@ -288,10 +354,10 @@ class Config(BaseConfig):
         # update input_file path
         self.set_value("app", "input_file", str(self.source_file.relative_to(self.project_dir)))
 
-        if self.project_dir != Path.cwd():
+        if self.project_dir != self._cwd:
             self.set_value("app", "project_dir", str(self.project_dir))
         else:
-            self.set_value("app", "project_dir", str(self.project_dir.relative_to(Path.cwd())))
+            self.set_value("app", "project_dir", str(self.project_dir.relative_to(self._cwd)))
 
     def _find_and_set_project_file(self):
         if self.project_dir:
@@ -306,25 +372,24 @@ class Config(BaseConfig):
             logging.warning("DEPLOY: More that one .pyproject files found. Project file not set")
             raise
         else:
-            self.project_data = ProjectData(files[0])
+            self.project_data = self._get_project_data(files[0])
             self.set_value("app", "project_file", str(files[0].relative_to(self.project_dir)))
             logging.info(f"[DEPLOY] Project file {files[0]} found and set in config file")
 
     def _find_and_set_excluded_qml_plugins(self):
         if self.qml_files:
-            self.qml_modules = set(run_qmlimportscanner(qml_files=self.qml_files,
-                                                            dry_run=self.dry_run))
-            self.excluded_qml_plugins = EXCLUDED_QML_PLUGINS.difference(self.qml_modules)
-
-            # needed for dry_run testing
-            self.excluded_qml_plugins = sorted(self.excluded_qml_plugins)
+            self.qml_modules = frozenset(run_qmlimportscanner(qml_files=self.qml_files,
+                                                              dry_run=self.dry_run))
+            excluded = [plugin for plugin in EXCLUDED_QML_PLUGINS_SORTED
+                        if plugin not in self.qml_modules]
+            self.excluded_qml_plugins = excluded
 
-            if self.excluded_qml_plugins:
-                self.set_value("qt", "excluded_qml_plugins", ",".join(self.excluded_qml_plugins))
+            if excluded:
+                self.set_value("qt", "excluded_qml_plugins", ",".join(excluded))
 
     def _find_and_set_exe_dir(self):
-        if self.project_dir == Path.cwd():
-            self.exe_dir = self.project_dir.relative_to(Path.cwd())
+        if self.project_dir == self._cwd:
+            self.exe_dir = self.project_dir.relative_to(self._cwd)
         else:
             self.exe_dir = self.project_dir
         self.exe_dir = Path(
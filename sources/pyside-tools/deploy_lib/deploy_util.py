@@ -13,7 +13,10 @@ from .python_helper import PythonExecutable
 
 def config_option_exists():
     for argument in sys.argv:
-        if any(item in argument for item in ["--config-file", "-c"]):
+        option = argument.split("=", 1)[0]
+        # argparse also accepts unambiguous abbreviations of long options, eg. --config
+        if option.startswith("-c") or (option.startswith("--c")
+                                       and "--config-file".startswith(option)):
             return True
 
     return False
@@ -114,4 +117,4 @@ def finalize(config: Config):
     if generated_exec_path.exists() and config.exe_dir:
         shutil.copy(generated_exec_path, config.exe_dir)
         print("[DEPLOY] Executed file created in "
-              f"{str(config.exe_dir / (config.source_file.stem + EXE_FORMAT))}")
+              f"{str(config.exe_dir / generated_exec_path.name)}")
@@ -1,6 +1,7 @@
 # Copyright (C) 2022 The Qt Company Ltd.
 # SPDX-License-Identifier: LicenseRef-Qt-Commercial OR LGPL-3.0-only OR GPL-2.0-only OR GPL-3.0-only
 
+import functools
 import unittest
 import tempfile
 import shutil
@@ -12,6 +13,19 @@ from unittest.mock import patch
 from unittest import mock
 
 
+@functools.lru_cache(maxsize=None)
+def _bootstrap():
+    """Locate the pyside-setup root and import the deploy modules, once for all test classes"""
+    pyside_root = Path(__file__).parents[5].resolve()
+    tools_path = str(pyside_root / "sources" / "pyside-tools")
+    if tools_path not in sys.path:
+        sys.path.append(tools_path)
+    deploy_lib = importlib.import_module("deploy_lib")
+    deploy = importlib.import_module("deploy")
+    sys.modules["deploy"] = deploy
+    return pyside_root, deploy_lib, deploy
+
+
 def is_pyenv_python():
     pyenv_root = os.environ.get("PYENV_ROOT")
 
@@ -45,7 +59,7 @@ class LongSortedOptionTest(unittest.TestCase):
 class DeployTestBase(LongSortedOptionTest):
     @classmethod
     def setUpClass(cls):
-        cls.pyside_root = Path(__file__).parents[5].resolve()
+        cls.pyside_root, cls.deploy_lib, cls.deploy = _bootstrap()
         cls.example_root = cls.pyside_root / "examples"
         cls.temp_dir = tempfile.mkdtemp()
         cls.current_dir = Path.cwd()
@@ -53,11 +67,6 @@ class DeployTestBase(LongSortedOptionTest):
         cls.win_icon = tools_path / "deploy_lib" / "pyside_icon.ico"
         cls.linux_icon = tools_path / "deploy_lib" / "pyside_icon.jpg"
         cls.macos_icon = tools_path / "deploy_lib" / "pyside_icon.icns"
-        if tools_path not in sys.path:
-            sys.path.append(str(cls.pyside_root / "sources" / "pyside-tools"))
-        cls.deploy_lib = importlib.import_module("deploy_lib")
-        cls.deploy = importlib.import_module("deploy")
-        sys.modules["deploy"] = cls.deploy
 
         # required for comparing long strings
         cls.maxDiff = None
@@ -307,5 +316,62 @@ class TestPySide6DeployWebEngine(DeployTestBase):
         )
 
 
+class TestPySide6DeployQmlSearch(DeployTestBase):
+    def setUp(self):
+        self.project_dir = Path(tempfile.mkdtemp(dir=self.temp_dir)).resolve()
+        self.main_file = self.project_dir / "main.py"
+        self.main_file.write_text("print('hello')\n")
+
+    def _add_qml_file(self, relative_path):
+        qml_file = self.project_dir / relative_path
+        qml_file.parent.mkdir(parents=True, exist_ok=True)
+        qml_file.write_text("import QtQuick\n")
+        return qml_file
+
+    def testExcludedDirectories(self):
+        expected = {self._add_qml_file("main.qml"), self._add_qml_file("sub/Item.qml")}
+        # QML files shipped with PySide6 in a venv inside the project, and generated or
+        # version control directories, are not searched
+        self._add_qml_file(".venv/lib/python3/site-packages/PySide6/qml/Shipped.qml")
+        self._add_qml_file("build/Generated.qml")
+        self._add_qml_file("deployment/Generated.qml")
+        self._add_qml_file(".git/Tracked.qml")
+        self._add_qml_file("__pycache__/Cached.qml")
+
+        qml_files = set(self.deploy_lib.config._find_qml_files(self.project_dir))
+        self.assertEqual(qml_files, expected)
+
+    def testUnreadableDirectory(self):
+        # directories that cannot be listed are skipped instead of raising
+        missing_dir = self.project_dir / "missing"
+        self.assertEqual(list(self.deploy_lib.config._find_qml_files(missing_dir)), [])
+
+    def testManyQmlFiles(self):
+        # a large number of QML files only warns
+        for i in range(501):
+            self._add_qml_file(f"qml/Item{i}.qml")
+        os.chdir(self.project_dir)
+        with patch("deploy_lib.config.run_qmlimportscanner") as mock_qmlimportscanner:
+            mock_qmlimportscanner.return_value = ["QtQuick"]
+            with self.assertWarns(UserWarning):
+                self.deploy.main(self.main_file, dry_run=True, force=True)
+
+
+class TestPySide6DeployConfigOption(DeployTestBase):
+    def testConfigOptionExists(self):
+        for argv in (["deploy.py", "-c", "x.spec"], ["deploy.py", "-cx.spec"],
+                     ["deploy.py", "--config-file", "x.spec"],
+                     ["deploy.py", "--config-file=x.spec"],
+                     ["deploy.py", "--config", "x.spec"], ["deploy.py", "--conf=x.spec"]):
+            with self.subTest(argv=argv), patch.object(sys, "argv", argv):
+                self.assertTrue(self.deploy_lib.config_option_exists())
+
+    def testConfigOptionMissing(self):
+        for argv in (["deploy.py"], ["deploy.py", "main.py", "--dry-run"],
+                     ["deploy.py", "my-config.py"], ["deploy.py", "--config-files"]):
+            with self.subTest(argv=argv), patch.object(sys, "argv", argv):
+                self.assertFalse(self.deploy_lib.config_option_exists())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -31,6 +31,7 @@ class ByteArrayConcatenationOperatorTest(unittest.TestCase):
         result = ba + '\x00bar'
         self.assertEqual(type(result), ByteArray)
         self.assertEqual(result, 'foo\x00bar')
+        self.assertEqual(result, b'foo\x00bar')
 
     def testConcatPythonStringAndByteArray(self):
         # Test concatenation of a Python string with a ByteArray, in this order.
@@ -39,6 +40,7 @@ class ByteArrayConcatenationOperatorTest(unittest.TestCase):
         result = 'bar\x00' + ba
         self.assertEqual(type(result), ByteArray)
         self.assertEqual(result, 'bar\x00foo')
+        self.assertEqual(result, b'bar\x00foo')
 
 
 class ByteArrayOperatorEqual(unittest.TestCase):
@@ -51,19 +53,12 @@ class ByteArrayOperatorEqual(unittest.TestCase):
         self.assertEqual(obj1, obj2)
 
     def testSimple(self):
-        # ByteArray(some_string) == ByteArray(some_string)
-        string = 'egg snakes'
-        self.assertEqual(ByteArray(string), ByteArray(string))
-
-    def testPyString(self):
-        # ByteArray(string) == string
-        string = 'my test string'
-        self.assertEqual(ByteArray(string), string)
-
-    def testQString(self):
-        # ByteArray(string) == string
-        string = 'another test string'
-        self.assertEqual(ByteArray(string), string)
+        # ByteArray(some_string) == ByteArray(some_string) and ByteArray(string) == string
+        for string in ('egg snakes', 'my test string', 'another test string'):
+            with self.subTest(string=string):
+                ba = ByteArray(string)
+                self.assertEqual(ba, ByteArray(string))
+                self.assertEqual(ba, string)
 
 
 class ByteArrayOperatorAt(unittest.TestCase):
@@ -72,27 +67,30 @@ class ByteArrayOperatorAt(unittest.TestCase):
     def testInRange(self):
         # ByteArray[x] where x is a valid index.
         string = 'abcdefgh'
+        encoded = string.encode("utf-8")
         obj = ByteArray(string)
         for i in range(len(string)):
-            self.assertEqual(obj[i], bytes(string[i], "UTF8"))
+            self.assertEqual(obj[i], encoded[i:i + 1])
 
     def testInRangeReverse(self):
         # ByteArray[x] where x is a valid index (reverse order).
         string = 'abcdefgh'
+        encoded = string.encode("utf-8")
         obj = ByteArray(string)
         for i in range(len(string)-1, 0, -1):
-            self.assertEqual(obj[i], bytes(string[i], "UTF8"))
+            self.assertEqual(obj[i], encoded[i:i + 1])
 
     def testOutOfRange(self):
         # ByteArray[x] where x is out of index.
         string = '1234567'
         obj = ByteArray(string)
-        self.assertRaises(IndexError, lambda :obj[len(string)])
+        with self.assertRaises(IndexError):
+            obj[len(string)]
 
     def testNullStrings(self):
         ba = ByteArray('\x00')
         self.assertEqual(ba.at(0), '\x00')
-        self.assertEqual(ba[0], bytes('\x00', "UTF8"))
+        self.assertEqual(ba[0], b'\x00')
 
 
 class ByteArrayOperatorLen(unittest.TestCase):
@@ -101,9 +99,9 @@ class ByteArrayOperatorLen(unittest.TestCase):
     def testBasic(self):
         '''ByteArray __len__'''
         self.assertEqual(len(ByteArray()), 0)
-        self.assertEqual(len(ByteArray('')), 0)
-        self.assertEqual(len(ByteArray(' ')), 1)
-        self.assertEqual(len(ByteArray('yabadaba')), 8)
+        for s, n in (('', 0), (' ', 1), ('yabadaba', 8)):
+            with self.subTest(s=s):
+                self.assertEqual(len(ByteArray(s)), n)
 
 
 class ByteArrayAndPythonStr(unittest.TestCase):
@@ -112,8 +110,9 @@ class ByteArrayAndPythonStr(unittest.TestCase):
     def testStrOperator(self):
         '''ByteArray __str__'''
         self.assertEqual(ByteArray().__str__(), '')
-        self.assertEqual(ByteArray('').__str__(), '')
-        self.assertEqual(ByteArray('aaa').__str__(), 'aaa')
+        for s in ('', 'aaa'):
+            with self.subTest(s=s):
+                self.assertEqual(ByteArray(s).__str__(), s)
 
     def testPythonStrAndNull(self):
         s1 = bytes('123\000321', "UTF8")